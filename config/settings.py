@@ -150,6 +150,33 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Logging: the services log via logging.getLogger(__name__) instead of
+# print(), so handlers/levels are controlled here. A QueueHandler setup
+# would need Python 3.12's dictConfig support; the deploy image runs 3.11,
+# so a plain console handler is used.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {
+            'format': '{levelname} {asctime} {name} {message}',
+            'style': '{',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'simple',
+        },
+    },
+    'loggers': {
+        'trips': {
+            'handlers': ['console'],
+            'level': os.environ.get('TRIPS_LOG_LEVEL', 'WARNING'),
+        },
+    },
+}
+
 # Security settings for production
 if not DEBUG:
     SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
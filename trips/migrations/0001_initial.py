@@ -0,0 +1,30 @@
+# Generated by Django 4.2.16 on 2026-08-28 01:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Trip',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('current_location', models.CharField(max_length=500)),
+                ('pickup_location', models.CharField(max_length=500)),
+                ('dropoff_location', models.CharField(max_length=500)),
+                ('current_cycle_hours', models.FloatField(default=0)),
+                ('results_json', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('current_location', 'pickup_location', 'dropoff_location', 'current_cycle_hours'), name='trip_lookup_uniq')],
+            },
+        ),
+    ]
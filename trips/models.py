@@ -10,7 +10,25 @@ class Trip(models.Model):
     pickup_location = models.CharField(max_length=500)
     dropoff_location = models.CharField(max_length=500)
     current_cycle_hours = models.FloatField(default=0)
+    # Memoized plan_trip response, so repeat trips skip geocoding/routing
+    results_json = models.JSONField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # One row per memoization key: concurrent identical requests
+            # can't insert duplicates (which would make update_or_create
+            # raise MultipleObjectsReturned forever after), and the unique
+            # index serves the repeat-trip lookup
+            models.UniqueConstraint(
+                fields=[
+                    'current_location', 'pickup_location',
+                    'dropoff_location', 'current_cycle_hours'
+                ],
+                name='trip_lookup_uniq'
+            )
+        ]
+
     def __str__(self):
         return f"Trip from {self.current_location} to {self.dropoff_location}"
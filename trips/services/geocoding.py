@@ -2,43 +2,129 @@
 Geocoding service using Nominatim API.
 Converts addresses to coordinates and vice versa.
 """
+import json
+import logging
+import sys
+
 import requests
+from requests.adapters import HTTPAdapter
+import sqlite3
+import threading
 import time
+from collections import OrderedDict
 from typing import Optional, Tuple, Dict
 
+from ._us_states import abbreviate
+
+logger = logging.getLogger(__name__)
+
 
 class GeocodingService:
     """Service for geocoding addresses using Nominatim (OpenStreetMap)."""
-    
+
     BASE_URL = "https://nominatim.openstreetmap.org"
     USER_AGENT = "ELDTripPlanner/1.0"
-    
-    def __init__(self):
+    CACHE_PATH = "geocache.db"
+    # ~3 decimal places = ~110m grid, close enough for city-level reverse lookups
+    COORD_PRECISION = 3
+    REQUEST_TIMEOUT = 10.0
+    MEMORY_CACHE_SIZE = 4096
+
+    def __init__(self, cache_path: str = None):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': self.USER_AGENT
         })
+        # Keep-alive pool sized for the batch lookups issued from the
+        # thread pool, so all requests in a trip reuse warm TLS connections
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
         self._last_request_time = 0
-    
+        # Bounded LRU in front of the on-disk store: keys are
+        # user-supplied addresses, so an uncapped dict would grow for the
+        # life of the worker
+        self._memory_cache: OrderedDict[str, str] = OrderedDict()
+        # Lookups may be issued from a thread pool, so the connection is
+        # shared across threads and guarded by locks below
+        self._db = sqlite3.connect(cache_path or self.CACHE_PATH, check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS geocache (key TEXT PRIMARY KEY, value TEXT)'
+        )
+        self._db.commit()
+        self._db_lock = threading.Lock()
+        self._rate_lock = threading.Lock()
+
     def _rate_limit(self):
         """Ensure we don't exceed Nominatim's rate limit (1 request/second)."""
-        elapsed = time.time() - self._last_request_time
-        if elapsed < 1.0:
-            time.sleep(1.0 - elapsed)
-        self._last_request_time = time.time()
-    
+        with self._rate_lock:
+            elapsed = time.time() - self._last_request_time
+            if elapsed < 1.0:
+                time.sleep(1.0 - elapsed)
+            self._last_request_time = time.time()
+
+    def _memory_put(self, key: str, value: str):
+        """Insert into the in-memory LRU, evicting the oldest past the cap."""
+        self._memory_cache[key] = value
+        self._memory_cache.move_to_end(key)
+        while len(self._memory_cache) > self.MEMORY_CACHE_SIZE:
+            self._memory_cache.popitem(last=False)
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        """Look up a cached value, first in memory then in the on-disk store."""
+        value = self._memory_cache.get(key)
+        if value is not None:
+            self._memory_cache.move_to_end(key)
+            return value
+
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    'SELECT value FROM geocache WHERE key = ?', (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            # Treat an unreadable on-disk cache as a miss; the lookup
+            # falls through to the network
+            logger.warning("Geocache read failed: %s", e)
+            row = None
+        if row:
+            value = row[0]
+            self._memory_put(key, value)
+        return value
+
+    def _cache_put(self, key: str, value: str):
+        """Store a value in both the in-memory and on-disk caches."""
+        self._memory_put(key, value)
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO geocache (key, value) VALUES (?, ?)',
+                    (key, value)
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            # A failed cache write (e.g. "database is locked" with several
+            # workers sharing the file) must not fail the lookup that
+            # produced the value
+            logger.warning("Geocache write failed: %s", e)
+
     def geocode(self, address: str) -> Optional[Dict]:
         """
         Convert an address to coordinates.
-        
+
         Args:
             address: The address string to geocode
-            
+
         Returns:
             Dict with lat, lng, display_name or None if not found
         """
+        # Normalize so "Dallas, TX", " dallas,  tx" etc. share a cache entry
+        cache_key = f"geocode:{' '.join(address.split()).lower()}"
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return json.loads(cached)
+
+        # Cache miss: the rate limit only applies to actual Nominatim requests
         self._rate_limit()
-        
+
         try:
             response = self.session.get(
                 f"{self.BASE_URL}/search",
@@ -47,36 +133,44 @@ class GeocodingService:
                     'format': 'json',
                     'limit': 1,
                     'countrycodes': 'us'
-                }
+                },
+                timeout=self.REQUEST_TIMEOUT
             )
             response.raise_for_status()
             results = response.json()
             
             if results:
                 result = results[0]
-                return {
+                location = {
                     'lat': float(result['lat']),
                     'lng': float(result['lon']),
                     'display_name': result['display_name']
                 }
+                self._cache_put(cache_key, json.dumps(location))
+                return location
             return None
         except Exception as e:
-            print(f"Geocoding error: {e}")
+            logger.warning("Geocoding error: %s", e)
             return None
-    
+
     def reverse_geocode(self, lat: float, lng: float) -> Optional[str]:
         """
         Convert coordinates to a location name.
-        
+
         Args:
             lat: Latitude
             lng: Longitude
-            
+
         Returns:
             Location name string (City, State) or None
         """
+        cache_key = f"reverse:{round(lat, self.COORD_PRECISION)},{round(lng, self.COORD_PRECISION)}"
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return json.loads(cached)
+
         self._rate_limit()
-        
+
         try:
             response = self.session.get(
                 f"{self.BASE_URL}/reverse",
@@ -85,44 +179,33 @@ class GeocodingService:
                     'lon': lng,
                     'format': 'json',
                     'zoom': 10  # City level
-                }
+                },
+                timeout=self.REQUEST_TIMEOUT
             )
             response.raise_for_status()
             result = response.json()
             
+            location = None
             if 'address' in result:
                 addr = result['address']
                 city = addr.get('city') or addr.get('town') or addr.get('village') or addr.get('county', '')
                 state = addr.get('state', '')
-                
+
                 # Get state abbreviation
-                state_abbr = self._get_state_abbreviation(state)
-                
+                state_abbr = abbreviate(state)
+
+                # Intern the name: stops cluster geographically, so the same
+                # city string comes back for many coordinates
                 if city and state_abbr:
-                    return f"{city}, {state_abbr}"
+                    location = sys.intern(f"{city}, {state_abbr}")
                 elif city:
-                    return city
-            
-            return result.get('display_name', 'Unknown Location')
+                    location = sys.intern(city)
+
+            if location is None:
+                location = sys.intern(result.get('display_name', 'Unknown Location'))
+
+            self._cache_put(cache_key, json.dumps(location))
+            return location
         except Exception as e:
-            print(f"Reverse geocoding error: {e}")
+            logger.warning("Reverse geocoding error: %s", e)
             return None
-    
-    def _get_state_abbreviation(self, state_name: str) -> str:
-        """Convert state name to abbreviation."""
-        states = {
-            'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR',
-            'California': 'CA', 'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE',
-            'Florida': 'FL', 'Georgia': 'GA', 'Hawaii': 'HI', 'Idaho': 'ID',
-            'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA', 'Kansas': 'KS',
-            'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD',
-            'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN', 'Mississippi': 'MS',
-            'Missouri': 'MO', 'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV',
-            'New Hampshire': 'NH', 'New Jersey': 'NJ', 'New Mexico': 'NM', 'New York': 'NY',
-            'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH', 'Oklahoma': 'OK',
-            'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC',
-            'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT',
-            'Vermont': 'VT', 'Virginia': 'VA', 'Washington': 'WA', 'West Virginia': 'WV',
-            'Wisconsin': 'WI', 'Wyoming': 'WY', 'District of Columbia': 'DC'
-        }
-        return states.get(state_name, state_name[:2].upper() if state_name else '')
@@ -2,20 +2,166 @@
 HOS (Hours of Service) Calculator.
 Implements FMCSA regulations for property-carrying drivers.
 """
+import functools
+import re
+import sys
 from typing import List, Dict, Tuple
+from collections import Counter
 from datetime import datetime, timedelta
-from dataclasses import dataclass, field
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 
-@dataclass
-class HOSState:
-    """Tracks the current HOS state."""
-    driving_hours_today: float = 0.0          # 11-hour limit
-    on_duty_hours_today: float = 0.0          # 14-hour window
-    hours_since_last_break: float = 0.0       # 30-min break after 8 hours
-    cycle_hours_used: float = 0.0             # 70-hour/8-day limit
-    current_time: datetime = field(default_factory=datetime.now)
-    current_miles: float = 0.0
+from ._us_states import STATE_ABBREV, STATE_NAMES
+from .routing import RoutingService
+
+# Indexes into the HOS state array (see HOSCalculator._state)
+_DRIVING = 0        # driving hours today (11-hour limit)
+_ON_DUTY = 1        # on-duty hours today (14-hour window)
+_SINCE_BREAK = 2    # hours since last 30-minute break
+_CYCLE = 3          # cycle hours used (70-hour/8-day limit)
+_MILES = 4          # cumulative miles driven
+
+
+# Shared unit timedeltas: scaling these avoids re-running the timedelta
+# constructor's keyword normalization on every state update
+_ONE_HOUR = timedelta(hours=1)
+_ONE_MINUTE = timedelta(minutes=1)
+
+# Event codes produced by _plan_leg_events
+EVENT_BREAK = 0
+EVENT_REST = 1
+EVENT_FUEL = 2
+
+
+def _plan_leg_events(
+    distance: float,
+    speed: float,
+    driving_hours: float,
+    hours_since_break: float,
+    current_miles: float,
+    max_driving: float,
+    break_after: float,
+    fuel_interval: float,
+    next_fuel_mile: float
+) -> List[Tuple[int, float]]:
+    """
+    Pure-numeric planning kernel for one driving leg.
+
+    Walks the leg with scalar float arithmetic only — no I/O, no geocoding,
+    no object state — and returns (event_code, miles_driven) rows where
+    miles_driven is the distance covered since the previous event. Keeping
+    the loop free of side effects lets the caller replay the events to build
+    stop records, and would let a JIT compiler take the function as-is if
+    planning ever became CPU-bound.
+    """
+    events: List[Tuple[int, float]] = []
+    remaining = distance
+    pending_miles = 0.0
+
+    while remaining > 0:
+        miles_until_break = max(0.0, (break_after - hours_since_break) * speed)
+        miles_until_rest = max(0.0, (max_driving - driving_hours) * speed)
+        miles_until_fuel = next_fuel_mile - current_miles
+
+        max_drivable = min(remaining, miles_until_break, miles_until_rest, miles_until_fuel)
+
+        if max_drivable <= 0:
+            # Need to take a break/rest/fuel stop before continuing
+            if driving_hours >= max_driving:
+                events.append((EVENT_REST, pending_miles))
+                pending_miles = 0.0
+                driving_hours = 0.0
+                hours_since_break = 0.0
+            elif hours_since_break >= break_after:
+                events.append((EVENT_BREAK, pending_miles))
+                pending_miles = 0.0
+                hours_since_break = 0.0
+            elif current_miles >= next_fuel_mile - 1e-6:
+                events.append((EVENT_FUEL, pending_miles))
+                pending_miles = 0.0
+                next_fuel_mile += fuel_interval
+            continue
+
+        hours = max_drivable / speed
+        driving_hours += hours
+        hours_since_break += hours
+        current_miles += max_drivable
+        pending_miles += max_drivable
+        remaining -= max_drivable
+
+        if remaining > 0:
+            # Check which limit we hit
+            if driving_hours >= max_driving:
+                events.append((EVENT_REST, pending_miles))
+                pending_miles = 0.0
+                driving_hours = 0.0
+                hours_since_break = 0.0
+            elif hours_since_break >= break_after:
+                events.append((EVENT_BREAK, pending_miles))
+                pending_miles = 0.0
+                hours_since_break = 0.0
+            elif current_miles >= next_fuel_mile - 1e-6:
+                events.append((EVENT_FUEL, pending_miles))
+                pending_miles = 0.0
+                next_fuel_mile += fuel_interval
+
+    return events
+
+
+@dataclass(slots=True)
+class Stop:
+    """
+    A planned stop on the trip.
+
+    Slots keep per-stop memory to fixed attribute storage instead of a
+    12-key dict; dataclasses.asdict converts to plain dicts at the JSON
+    boundary.
+    """
+    id: int
+    type: str
+    location: str
+    coordinates: Dict
+    arrival_time: str
+    departure_time: str
+    duration_minutes: int
+    cumulative_miles: float
+    cumulative_driving_hours: float
+    day: int
+    duty_status: str
+    notes: str
+
+
+# Matches "City, ..., ST" or "City, ..., StateName": the city is the first
+# comma-separated field, the state the earliest later field that is either a
+# two-letter uppercase code or a full state name. Compiled once so
+# _format_location is a single regex pass instead of split + scan.
+_LOCATION_RE = re.compile(
+    r'^\s*([^,]+?)\s*,(?:[^,]*,)*?\s*(?:([A-Z]{2})|('
+    + '|'.join(sorted(map(re.escape, STATE_NAMES), key=len, reverse=True))
+    + r'))\s*(?:,|$)'
+)
+
+
+@functools.lru_cache(maxsize=512)
+def _format_location(location: str) -> str:
+    """
+    Format a location name to be more concise.
+
+    Pickup/dropoff display names and clustered rest-stop names repeat many
+    times within a trip, so results are memoized and interned: many stops
+    store the same name, and interning collapses them to one string object.
+    """
+    if not location:
+        return 'Unknown Location'
+
+    match = _LOCATION_RE.match(location)
+    if match:
+        city, abbrev, state_name = match.groups()
+        return sys.intern(f"{city}, {abbrev or STATE_ABBREV[state_name]}")
+
+    return sys.intern(location[:50] if len(location) > 50 else location)
 
 
 class HOSCalculator:
@@ -58,13 +204,29 @@ class HOSCalculator:
         if start_time is None:
             today = datetime.now().replace(hour=6, minute=0, second=0, microsecond=0)
             start_time = today
-        
-        self.state = HOSState(
-            cycle_hours_used=current_cycle_hours,
-            current_time=start_time
-        )
-        self.stops: List[Dict] = []
+
+        # HOS state lives in one contiguous float array (indexes above) so
+        # the planning math stays plain float arithmetic; the timestamp is
+        # kept separately since it is not numeric-hot
+        self._state = np.zeros(5, dtype=np.float64)
+        self._state[_CYCLE] = current_cycle_hours
+        self.current_time = start_time
+        self.stops: List[Stop] = []
         self.stop_id = 0
+        # Next mile at which a fuel stop is due; bumped by _take_fuel_stop.
+        # A monotone counter avoids floating-point modulo-equality checks
+        self._next_fuel_mile = float(self.FUEL_STOP_INTERVAL_MILES)
+        # Running stop-type counts so get_summary is O(1)
+        self._type_counts = Counter()
+        # Set by the first _add_stop; used to compute day numbers without
+        # re-parsing the first stop's timestamp on every insertion
+        self._trip_start_date = None
+        # (stop index, lat, lng) for stops whose names are resolved in a batch
+        self._pending_locations: List[Tuple[int, float, float]] = []
+        # Per-trip geometry arrays built by _prepare_geometry
+        self._geom_lat: np.ndarray = None
+        self._geom_lng: np.ndarray = None
+        self._cum_miles: np.ndarray = None
     
     def calculate_trip(
         self, 
@@ -72,7 +234,7 @@ class HOSCalculator:
         locations: Dict[str, Dict],
         geometry: List[Tuple[float, float]],
         geocoder
-    ) -> List[Dict]:
+    ) -> List[Stop]:
         """
         Calculate all stops for an HOS-compliant trip.
         
@@ -87,7 +249,12 @@ class HOSCalculator:
         """
         self.stops = []
         self.stop_id = 0
-        
+        self._next_fuel_mile = float(self.FUEL_STOP_INTERVAL_MILES)
+        self._type_counts = Counter()
+        self._trip_start_date = None
+        self._pending_locations = []
+        self._prepare_geometry(geometry)
+
         total_distance = route_data['total_distance_miles']
         pickup_distance = route_data['legs'][0]['distance_miles']
         
@@ -105,7 +272,6 @@ class HOSCalculator:
         self._drive_segment(
             distance_miles=pickup_distance,
             geometry=geometry,
-            geocoder=geocoder,
             end_location=locations['pickup']['display_name'],
             end_coords=locations['pickup']
         )
@@ -125,7 +291,6 @@ class HOSCalculator:
         self._drive_segment(
             distance_miles=dropoff_distance,
             geometry=geometry,
-            geocoder=geocoder,
             start_miles=pickup_distance,
             end_location=locations['dropoff']['display_name'],
             end_coords=locations['dropoff']
@@ -150,159 +315,197 @@ class HOSCalculator:
             duty_status='on_duty',
             notes='Post-trip inspection'
         )
-        
+
+        # Stops were planned geometry-first; resolve their names in one batch
+        self._resolve_stop_locations(geocoder)
+
         return self.stops
-    
+
     def _drive_segment(
         self,
         distance_miles: float,
         geometry: List[Tuple[float, float]],
-        geocoder,
         end_location: str,
         end_coords: Dict,
         start_miles: float = 0
     ):
         """
         Process a driving segment, adding required stops.
+
+        The numeric planning runs once in _plan_leg_events; this method
+        replays the returned events to update HOS state and emit stops.
         """
-        from .routing import RoutingService
-        routing = RoutingService()
-        
-        remaining_distance = distance_miles
-        segment_start_miles = start_miles
-        
-        while remaining_distance > 0:
-            # Calculate how far we can drive before hitting a limit
-            miles_until_break = self._miles_until_break()
-            miles_until_rest = self._miles_until_rest()
-            miles_until_fuel = self._miles_until_fuel()
-            
-            # Find the limiting factor
-            max_drivable = min(
-                remaining_distance,
-                miles_until_break,
-                miles_until_rest,
-                miles_until_fuel
-            )
-            
-            if max_drivable <= 0:
-                # Need to take a break/rest before continuing
-                if self.state.driving_hours_today >= self.MAX_DRIVING_HOURS:
-                    self._take_rest(geometry, geocoder, segment_start_miles + (distance_miles - remaining_distance))
-                elif self.state.hours_since_last_break >= self.BREAK_REQUIRED_AFTER:
-                    self._take_break(geometry, geocoder, segment_start_miles + (distance_miles - remaining_distance))
-                continue
-            
-            # Drive the segment
-            driving_hours = max_drivable / self.AVERAGE_SPEED_MPH
-            self._update_state_for_driving(driving_hours, max_drivable)
-            remaining_distance -= max_drivable
-            
-            # Check if we need a stop after this driving segment
-            if remaining_distance > 0:
-                current_miles = segment_start_miles + (distance_miles - remaining_distance)
-                
-                # Check which limit we hit
-                if self.state.driving_hours_today >= self.MAX_DRIVING_HOURS:
-                    self._take_rest(geometry, geocoder, current_miles)
-                elif self.state.hours_since_last_break >= self.BREAK_REQUIRED_AFTER:
-                    self._take_break(geometry, geocoder, current_miles)
-                elif self._needs_fuel():
-                    self._take_fuel_stop(geometry, geocoder, current_miles)
-    
-    def _miles_until_break(self) -> float:
-        """Calculate miles until 30-minute break is required."""
-        hours_left = self.BREAK_REQUIRED_AFTER - self.state.hours_since_last_break
-        return max(0, hours_left * self.AVERAGE_SPEED_MPH)
-    
-    def _miles_until_rest(self) -> float:
-        """Calculate miles until 10-hour rest is required."""
-        hours_left = self.MAX_DRIVING_HOURS - self.state.driving_hours_today
-        return max(0, hours_left * self.AVERAGE_SPEED_MPH)
-    
-    def _miles_until_fuel(self) -> float:
-        """Calculate miles until fuel stop is needed."""
-        miles_since_fuel = self.state.current_miles % self.FUEL_STOP_INTERVAL_MILES
-        return self.FUEL_STOP_INTERVAL_MILES - miles_since_fuel
-    
-    def _needs_fuel(self) -> bool:
-        """Check if a fuel stop is needed."""
-        return self.state.current_miles > 0 and self.state.current_miles % self.FUEL_STOP_INTERVAL_MILES == 0
+        events = _plan_leg_events(
+            distance_miles,
+            self.AVERAGE_SPEED_MPH,
+            self._state[_DRIVING],
+            self._state[_SINCE_BREAK],
+            self._state[_MILES],
+            self.MAX_DRIVING_HOURS,
+            self.BREAK_REQUIRED_AFTER,
+            self.FUEL_STOP_INTERVAL_MILES,
+            self._next_fuel_mile
+        )
+
+        miles_covered = 0.0
+        for event_code, miles_driven in events:
+            if miles_driven > 0:
+                self._update_state_for_driving(miles_driven / self.AVERAGE_SPEED_MPH, miles_driven)
+            miles_covered += miles_driven
+            current_miles = start_miles + miles_covered
+
+            if event_code == EVENT_REST:
+                self._take_rest(geometry, current_miles)
+            elif event_code == EVENT_BREAK:
+                self._take_break(geometry, current_miles)
+            else:
+                self._take_fuel_stop(geometry, current_miles)
+
+        # Drive the remainder of the leg after the last required stop
+        remaining_distance = distance_miles - miles_covered
+        if remaining_distance > 0:
+            self._update_state_for_driving(remaining_distance / self.AVERAGE_SPEED_MPH, remaining_distance)
     
     def _update_state_for_driving(self, hours: float, miles: float):
         """Update HOS state after driving."""
-        self.state.driving_hours_today += hours
-        self.state.on_duty_hours_today += hours
-        self.state.hours_since_last_break += hours
-        self.state.cycle_hours_used += hours
-        self.state.current_time += timedelta(hours=hours)
-        self.state.current_miles += miles
+        # Driving counts toward all four hour limits at once
+        self._state[:_MILES] += hours
+        self._state[_MILES] += miles
+        self.current_time += hours * _ONE_HOUR
     
-    def _take_break(self, geometry, geocoder, current_miles: float):
+    def _take_break(self, geometry, current_miles: float):
         """Take a 30-minute break."""
         coords = self._get_coords_at_mile(geometry, current_miles)
-        location = geocoder.reverse_geocode(coords[0], coords[1]) or 'Unknown Location'
-        
-        self._add_stop(
+
+        self._add_pending_stop(
             stop_type='break',
-            location=location,
-            coordinates={'lat': coords[0], 'lng': coords[1]},
+            coords=coords,
             duration_minutes=self.REQUIRED_BREAK_MINUTES,
             duty_status='off_duty',
             notes='30-minute break (8 hours driving)'
         )
-        
-        self.state.hours_since_last_break = 0
-    
-    def _take_rest(self, geometry, geocoder, current_miles: float):
+
+        self._state[_SINCE_BREAK] = 0.0
+
+    def _take_rest(self, geometry, current_miles: float):
         """Take a 10-hour rest."""
         coords = self._get_coords_at_mile(geometry, current_miles)
-        location = geocoder.reverse_geocode(coords[0], coords[1]) or 'Unknown Location'
-        
-        self._add_stop(
+
+        self._add_pending_stop(
             stop_type='rest',
-            location=location,
-            coordinates={'lat': coords[0], 'lng': coords[1]},
+            coords=coords,
             duration_minutes=int(self.REQUIRED_REST_HOURS * 60),
             duty_status='off_duty',
             notes='10-hour rest (11-hour driving limit)'
         )
-        
+
         # Reset daily limits
-        self.state.driving_hours_today = 0
-        self.state.on_duty_hours_today = 0
-        self.state.hours_since_last_break = 0
-        
+        self._state[_DRIVING] = 0.0
+        self._state[_ON_DUTY] = 0.0
+        self._state[_SINCE_BREAK] = 0.0
+
         # Add pre-trip inspection after rest
-        self._add_stop(
+        self._add_pending_stop(
             stop_type='pre_trip',
-            location=location,
-            coordinates={'lat': coords[0], 'lng': coords[1]},
+            coords=coords,
             duration_minutes=self.PRE_TRIP_INSPECTION_MINUTES,
             duty_status='on_duty',
             notes='Pre-trip inspection'
         )
-    
-    def _take_fuel_stop(self, geometry, geocoder, current_miles: float):
+
+    def _take_fuel_stop(self, geometry, current_miles: float):
         """Take a fuel stop."""
         coords = self._get_coords_at_mile(geometry, current_miles)
-        location = geocoder.reverse_geocode(coords[0], coords[1]) or 'Unknown Location'
-        
-        self._add_stop(
+
+        self._add_pending_stop(
             stop_type='fuel',
-            location=location,
-            coordinates={'lat': coords[0], 'lng': coords[1]},
+            coords=coords,
             duration_minutes=self.FUEL_STOP_DURATION_MINUTES,
             duty_status='on_duty',
             notes='Fuel stop (1,000 miles)'
         )
+
+        self._next_fuel_mile += self.FUEL_STOP_INTERVAL_MILES
+
+    def _add_pending_stop(
+        self,
+        stop_type: str,
+        coords: Tuple[float, float],
+        duration_minutes: int,
+        duty_status: str,
+        notes: str
+    ):
+        """Add a stop whose location name is resolved later in a batch."""
+        self._add_stop(
+            stop_type=stop_type,
+            location=None,
+            coordinates={'lat': coords[0], 'lng': coords[1]},
+            duration_minutes=duration_minutes,
+            duty_status=duty_status,
+            notes=notes
+        )
+        self._pending_locations.append((len(self.stops) - 1, coords[0], coords[1]))
+
+    def _resolve_stop_locations(self, geocoder):
+        """
+        Resolve location names for stops placed along the route.
+
+        Planning is done geometry-first, so every reverse-geocode lookup can
+        be issued here in one batch: duplicate (quantized) coordinates are
+        resolved once, and the unique lookups run on a small thread pool so
+        cached hits return immediately instead of queueing behind
+        rate-limited misses.
+        """
+        if not self._pending_locations:
+            return
+
+        precision = getattr(geocoder, 'COORD_PRECISION', 3)
+        unique_coords = {}
+        for _, lat, lng in self._pending_locations:
+            unique_coords.setdefault((round(lat, precision), round(lng, precision)), (lat, lng))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {
+                key: executor.submit(geocoder.reverse_geocode, lat, lng)
+                for key, (lat, lng) in unique_coords.items()
+            }
+            resolved = {key: future.result() for key, future in futures.items()}
+
+        for index, lat, lng in self._pending_locations:
+            location = resolved.get((round(lat, precision), round(lng, precision))) or 'Unknown Location'
+            self.stops[index].location = _format_location(location)
+
+        self._pending_locations = []
     
+    def _prepare_geometry(self, geometry: List[Tuple[float, float]]):
+        """
+        Precompute cumulative distances along the route geometry.
+
+        Built once per trip so every stop lookup in _get_coords_at_mile is a
+        binary search instead of a linear scan over the polyline.
+        """
+        geom = np.asarray(geometry, dtype=np.float64)
+        self._geom_lat = geom[:, 0]
+        self._geom_lng = geom[:, 1]
+        self._cum_miles = RoutingService.cum_distance_miles(geom)
+
     def _get_coords_at_mile(self, geometry, miles: float) -> Tuple[float, float]:
         """Get coordinates at a specific mile point along the route."""
-        from .routing import RoutingService
-        routing = RoutingService()
-        coords = routing.get_point_along_route(geometry, miles)
-        return coords if coords else geometry[0]
+        cum = self._cum_miles
+
+        if miles <= 0:
+            return (float(self._geom_lat[0]), float(self._geom_lng[0]))
+        if miles >= cum[-1]:
+            return (float(self._geom_lat[-1]), float(self._geom_lng[-1]))
+
+        # Interpolate within the segment bracketing the target mile
+        i = int(np.searchsorted(cum, miles))
+        segment = cum[i] - cum[i - 1]
+        t = (miles - cum[i - 1]) / segment if segment > 0 else 0.0
+        lat = self._geom_lat[i - 1] + t * (self._geom_lat[i] - self._geom_lat[i - 1])
+        lng = self._geom_lng[i - 1] + t * (self._geom_lng[i] - self._geom_lng[i - 1])
+
+        return (float(lat), float(lng))
     
     def _add_stop(
         self,
@@ -315,97 +518,59 @@ class HOSCalculator:
     ):
         """Add a stop to the list."""
         self.stop_id += 1
-        
-        # Calculate day number (1-indexed)
-        start_of_trip = self.stops[0]['arrival_time'] if self.stops else self.state.current_time
-        if isinstance(start_of_trip, str):
-            start_of_trip = datetime.fromisoformat(start_of_trip)
-        
-        arrival_time = self.state.current_time
-        departure_time = arrival_time + timedelta(minutes=duration_minutes)
-        
-        # Calculate day based on calendar date
-        day = (arrival_time.date() - start_of_trip.date()).days + 1
-        
-        stop = {
-            'id': self.stop_id,
-            'type': stop_type,
-            'location': self._format_location(location),
-            'coordinates': {
+
+        arrival_time = self.current_time
+        departure_time = arrival_time + duration_minutes * _ONE_MINUTE
+
+        if self._trip_start_date is None:
+            self._trip_start_date = arrival_time.date()
+
+        # Calculate day number (1-indexed) based on calendar date
+        day = (arrival_time.date() - self._trip_start_date).days + 1
+
+        stop = Stop(
+            id=self.stop_id,
+            # Type/status/notes come from a small fixed vocabulary and are
+            # stored on every stop, so intern them to shared string objects
+            type=sys.intern(stop_type),
+            # None marks a pending location filled in by _resolve_stop_locations
+            location=_format_location(location) if location is not None else None,
+            coordinates={
                 'lat': coordinates.get('lat', coordinates[0] if isinstance(coordinates, tuple) else 0),
                 'lng': coordinates.get('lng', coordinates[1] if isinstance(coordinates, tuple) else 0)
             },
-            'arrival_time': arrival_time.isoformat(),
-            'departure_time': departure_time.isoformat(),
-            'duration_minutes': duration_minutes,
-            'cumulative_miles': round(self.state.current_miles, 1),
-            'cumulative_driving_hours': round(self.state.driving_hours_today, 2),
-            'day': day,
-            'duty_status': duty_status,
-            'notes': notes
-        }
-        
+            arrival_time=arrival_time.isoformat(),
+            departure_time=departure_time.isoformat(),
+            duration_minutes=duration_minutes,
+            cumulative_miles=round(float(self._state[_MILES]), 1),
+            cumulative_driving_hours=round(float(self._state[_DRIVING]), 2),
+            day=day,
+            duty_status=sys.intern(duty_status),
+            notes=sys.intern(notes)
+        )
+
         self.stops.append(stop)
+        self._type_counts[stop.type] += 1
         
         # Update time for non-driving stops (on_duty time counts)
         if duty_status == 'on_duty':
-            self.state.on_duty_hours_today += duration_minutes / 60
-            self.state.cycle_hours_used += duration_minutes / 60
-        
-        self.state.current_time = departure_time
-    
-    def _format_location(self, location: str) -> str:
-        """Format location to be more concise."""
-        if not location:
-            return 'Unknown Location'
-        
-        # Try to extract city and state
-        parts = location.split(',')
-        if len(parts) >= 2:
-            city = parts[0].strip()
-            # Look for state in the remaining parts
-            for part in parts[1:]:
-                part = part.strip()
-                if len(part) == 2 and part.isupper():
-                    return f"{city}, {part}"
-                # Check for state names
-                if part in ['California', 'Arizona', 'Texas', 'New Mexico', 'Nevada', 'Oklahoma', 'Arkansas', 'Louisiana', 'Mississippi', 'Alabama', 'Georgia', 'Florida', 'South Carolina', 'North Carolina', 'Virginia', 'Tennessee', 'Kentucky', 'Missouri', 'Kansas', 'Colorado', 'Utah', 'Oregon', 'Washington', 'Idaho', 'Montana', 'Wyoming', 'Nebraska', 'South Dakota', 'North Dakota', 'Minnesota', 'Iowa', 'Wisconsin', 'Illinois', 'Indiana', 'Ohio', 'Michigan', 'Pennsylvania', 'New York', 'New Jersey', 'Maryland', 'Delaware', 'Connecticut', 'Massachusetts', 'Rhode Island', 'Vermont', 'New Hampshire', 'Maine']:
-                    abbrev = self._state_to_abbrev(part)
-                    return f"{city}, {abbrev}"
-        
-        return location[:50] if len(location) > 50 else location
-    
-    def _state_to_abbrev(self, state: str) -> str:
-        """Convert state name to abbreviation."""
-        states = {
-            'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR',
-            'California': 'CA', 'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE',
-            'Florida': 'FL', 'Georgia': 'GA', 'Hawaii': 'HI', 'Idaho': 'ID',
-            'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA', 'Kansas': 'KS',
-            'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD',
-            'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN', 'Mississippi': 'MS',
-            'Missouri': 'MO', 'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV',
-            'New Hampshire': 'NH', 'New Jersey': 'NJ', 'New Mexico': 'NM', 'New York': 'NY',
-            'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH', 'Oklahoma': 'OK',
-            'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC',
-            'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT',
-            'Vermont': 'VT', 'Virginia': 'VA', 'Washington': 'WA', 'West Virginia': 'WV',
-            'Wisconsin': 'WI', 'Wyoming': 'WY'
-        }
-        return states.get(state, state[:2].upper())
+            self._state[_ON_DUTY] += duration_minutes / 60
+            self._state[_CYCLE] += duration_minutes / 60
+
+        self.current_time = departure_time
     
     def get_summary(self, total_distance: float) -> Dict:
         """Get trip summary statistics."""
-        fuel_stops = sum(1 for s in self.stops if s['type'] == 'fuel')
-        rest_breaks = sum(1 for s in self.stops if s['type'] == 'break')
-        rest_stops = sum(1 for s in self.stops if s['type'] == 'rest')
-        
+        fuel_stops = self._type_counts['fuel']
+        rest_breaks = self._type_counts['break']
+        rest_stops = self._type_counts['rest']
+
         # Calculate total duration
         if self.stops:
-            start_time = datetime.fromisoformat(self.stops[0]['arrival_time'])
-            end_time = datetime.fromisoformat(self.stops[-1]['departure_time'])
+            start_time = datetime.fromisoformat(self.stops[0].arrival_time)
+            end_time = datetime.fromisoformat(self.stops[-1].departure_time)
             total_hours = (end_time - start_time).total_seconds() / 3600
-            total_days = max(1, self.stops[-1]['day'])
+            total_days = max(1, self.stops[-1].day)
         else:
             total_hours = 0
             total_days = 0
@@ -417,5 +582,5 @@ class HOSCalculator:
             'fuel_stops': fuel_stops,
             'rest_breaks': rest_breaks,
             'rest_stops': rest_stops,
-            'cycle_hours_after': round(self.state.cycle_hours_used, 1)
+            'cycle_hours_after': round(float(self._state[_CYCLE]), 1)
         }
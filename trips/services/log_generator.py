@@ -2,85 +2,113 @@
 Log Generator for ELD daily log sheets.
 Creates 24-hour log sheets with duty status segments.
 """
-from typing import List, Dict, Optional
+from bisect import bisect_left
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+from operator import itemgetter
 
+import numpy as np
 
-class LogGenerator:
+# Duty statuses as small ints so a day fits in a packed int8 minute grid
+_STATUS_CODE = {'off_duty': 0, 'sleeper': 1, 'driving': 2, 'on_duty': 3}
+_STATUS_NAME = ('off_duty', 'sleeper', 'driving', 'on_duty')
+_MINUTES_PER_DAY = 1440
+
+# Fixed-field record for in-flight segments; converted to dicts only at
+# the log-sheet boundary
+Segment = namedtuple('Segment', 'status start_hour end_hour location notes')
+
+
+class Timeline:
     """
-    Generates ELD daily log sheets from trip stops.
-    
-    Each log sheet covers a 24-hour period (midnight to midnight).
-    The duty status line is continuous through the entire period.
+    Pre-indexed view of a trip's duty-status events.
+
+    Built once per stop list: timestamps are parsed and events sorted a
+    single time, with per-day buckets and the odometer timeline cached
+    alongside. Each day's log sheet is then a cheap query (day_log)
+    against the indexes instead of a rescan of the whole trip, which also
+    makes regenerating a single day's sheet O(events on that day).
     """
-    
-    def __init__(self):
-        self.log_sheets: List[Dict] = []
-    
-    def generate_logs(self, stops: List[Dict]) -> List[Dict]:
-        """
-        Generate daily log sheets from trip stops.
-        
-        Args:
-            stops: List of planned stops with timing information
-            
-        Returns:
-            List of daily log sheets
-        """
-        if not stops:
-            return []
-        
-        # First, create a timeline of all events
-        events = self._create_event_timeline(stops)
-        
-        # Get the date range
-        first_event = min(events, key=lambda x: x['time'])
-        last_event = max(events, key=lambda x: x['time'])
-        
-        start_date = datetime.fromisoformat(first_event['time']).date()
-        end_date = datetime.fromisoformat(last_event['time']).date()
-        
-        # Generate log for each day
-        self.log_sheets = []
-        current_date = start_date
-        day_num = 1
-        
-        while current_date <= end_date:
-            log_sheet = self._create_day_log(current_date, day_num, events, stops)
-            self.log_sheets.append(log_sheet)
-            current_date += timedelta(days=1)
-            day_num += 1
-        
-        return self.log_sheets
-    
-    def _create_event_timeline(self, stops: List[Dict]) -> List[Dict]:
-        """Create a flat timeline of all duty status changes."""
+
+    def __init__(self, stops: List[Dict]):
+        self.stops = stops
+
+        # Parse each stop's arrival time exactly once. Kept out of the
+        # stop dicts because those are serialized into the API response.
+        arrivals = [datetime.fromisoformat(stop['arrival_time']) for stop in stops]
+
+        # Stops grouped by calendar day, as (stop, arrival) pairs
+        self.stops_by_day = defaultdict(list)
+        for stop, arrival in zip(stops, arrivals):
+            self.stops_by_day[arrival.date()].append((stop, arrival))
+
+        # Chronological (arrival seconds, cumulative miles) pairs for
+        # day-boundary odometer lookups by bisection
+        self.miles_timeline = [
+            (int(arrival.timestamp()), stop['cumulative_miles'])
+            for stop, arrival in zip(stops, arrivals)
+        ]
+
+        self.events = self._build_events(stops)
+
+        # Parallel list of integer event timestamps: comparisons and
+        # bisection run on plain ints instead of datetime objects
+        self.event_ts = [event['ts'] for event in self.events]
+
+        # Events partitioned into per-day buckets in one pass
+        self.events_by_day = defaultdict(list)
+        for event in self.events:
+            self.events_by_day[event['datetime'].date()].append(event)
+
+        # Events come back sorted, so the extremes are the ends
+        self.start_date = self.events[0]['datetime'].date()
+        self.end_date = self.events[-1]['datetime'].date()
+
+    def date_range(self):
+        """Yield each calendar date the trip touches, in order."""
+        current = self.start_date
+        while current <= self.end_date:
+            yield current
+            current += timedelta(days=1)
+
+    @staticmethod
+    def _build_events(stops: List[Dict]) -> List[Dict]:
+        """Create a flat, sorted timeline of all duty status changes."""
         events = []
-        
+
         for i, stop in enumerate(stops):
             arrival = stop['arrival_time']
             departure = stop['departure_time']
+            # Parse once and carry the datetime on the event; every
+            # downstream pass reads the cached value instead of re-parsing
+            arrival_dt = datetime.fromisoformat(arrival)
+            departure_dt = datetime.fromisoformat(departure)
+            arrival_ts = int(arrival_dt.timestamp())
+            departure_ts = int(departure_dt.timestamp())
             stop_type = stop.get('type', '')
-            
-            # Determine status for this stop
+
+            # Determine status for this stop, stored as its int code;
+            # names reappear only at the segment-serialization boundary
             if stop_type in ['rest', 'break']:
-                status = 'off_duty'
+                status_code = _STATUS_CODE['off_duty']
             elif stop.get('duty_status') == 'off_duty':
-                status = 'off_duty'
+                status_code = _STATUS_CODE['off_duty']
             else:
-                status = 'on_duty'
-            
+                status_code = _STATUS_CODE['on_duty']
+
             # Add arrival event (start of stop activity)
             events.append({
                 'time': arrival,
-                'status': status,
+                'datetime': arrival_dt,
+                'ts': arrival_ts,
+                'status_code': status_code,
                 'location': stop['location'],
                 'notes': stop.get('notes', ''),
                 'type': 'stop_start',
                 'stop_type': stop_type
             })
-            
+
             # Add departure event (end of stop, start driving to next)
             # Check if there's a next stop to drive to
             if i < len(stops) - 1:
@@ -88,7 +116,9 @@ class LogGenerator:
                 # If this stop's departure leads to driving
                 events.append({
                     'time': departure,
-                    'status': 'driving',
+                    'datetime': departure_dt,
+                    'ts': departure_ts,
+                    'status_code': _STATUS_CODE['driving'],
                     'location': 'En route',
                     'notes': f"Driving to {next_stop['location']}",
                     'type': 'driving_start',
@@ -98,276 +128,209 @@ class LogGenerator:
                 # Last stop - go off duty after
                 events.append({
                     'time': departure,
-                    'status': 'off_duty',
+                    'datetime': departure_dt,
+                    'ts': departure_ts,
+                    'status_code': _STATUS_CODE['off_duty'],
                     'location': stop['location'],
                     'notes': 'Trip complete',
                     'type': 'trip_end',
                     'stop_type': 'end'
                 })
-        
-        # Sort by time
-        events.sort(key=lambda x: x['time'])
-        
+
+        # Sort on the cached integer timestamp; itemgetter avoids a
+        # Python-level lambda per comparison
+        events.sort(key=itemgetter('ts'))
+
         return events
-    
-    def _create_day_log(
-        self, 
-        date, 
-        day_num: int, 
-        events: List[Dict],
-        stops: List[Dict]
-    ) -> Dict:
+
+    def day_log(self, date, day_num: int) -> Dict:
         """Create a log sheet for a single day."""
         if isinstance(date, str):
             date = datetime.strptime(date, '%Y-%m-%d').date()
-        
+
+        # Day boundary as integer seconds (via datetime so DST-length
+        # days stay correct)
         midnight_start = datetime.combine(date, datetime.min.time())
-        midnight_end = midnight_start + timedelta(days=1)
-        
+        day_start_ts = int(midnight_start.timestamp())
+
         # Generate segments for this day
-        segments = self._generate_day_segments(midnight_start, midnight_end, events, day_num)
-        
+        segments, grid = self._generate_day_segments(
+            day_start_ts, self.events_by_day[date], day_num
+        )
+
         # Calculate totals
-        totals = self._calculate_totals(segments)
-        
+        totals = self._calculate_totals(grid)
+
+        day_stops = self.stops_by_day[date]
+
         # Calculate miles for this day
-        total_miles = self._calculate_day_miles(date, stops)
-        
+        total_miles = self._calculate_day_miles(day_start_ts, day_stops)
+
         # Generate remarks for stops on this day
-        remarks = self._generate_remarks(date, stops)
-        
+        remarks = self._generate_remarks(day_stops)
+
         return {
             'date': date.strftime('%m/%d/%Y'),
             'day_number': day_num,
             'total_miles': round(total_miles, 1),
-            'segments': segments,
+            'segments': [segment._asdict() for segment in segments],
             'totals': totals,
             'remarks': remarks
         }
-    
+
     def _generate_day_segments(
         self,
-        day_start: datetime,
-        day_end: datetime,
-        events: List[Dict],
+        day_start_ts: int,
+        day_events: List[Dict],
         day_num: int
-    ) -> List[Dict]:
-        """Generate duty status segments for a 24-hour period."""
-        segments = []
-        
-        # Find events relevant to this day
-        day_events = []
-        
-        for event in events:
-            event_time = datetime.fromisoformat(event['time'])
-            if event_time >= day_start and event_time < day_end:
-                day_events.append({
-                    **event,
-                    'datetime': event_time
-                })
-        
+    ) -> Tuple[List[Segment], np.ndarray]:
+        """
+        Generate duty status segments for a 24-hour period.
+
+        The day is painted onto a 1440-minute status grid, so coverage of
+        exactly 24 hours with no gaps or overlaps holds by construction
+        and consecutive same-status runs are merged for free. Returns the
+        segment records plus the grid (used for the totals).
+        """
         # Find what status we're in at the start of the day
-        initial_status = self._get_status_at_time(day_start, events, day_num)
-        
-        # Build segments
-        current_hour = 0.0
-        current_status = initial_status['status']
-        current_location = initial_status.get('location', '')
-        
+        initial_status = self._get_status_at_time(day_start_ts, day_num)
+
+        # Paint each event's status from its minute to the end of the day;
+        # later events overwrite, leaving each minute with its final status
+        grid = np.full(_MINUTES_PER_DAY, initial_status['status_code'], dtype=np.int8)
+        locations = [initial_status.get('location', '')]
+        loc_idx = np.zeros(_MINUTES_PER_DAY, dtype=np.int16)
+
         for event in day_events:
-            event_hour = self._time_to_hours(event['datetime'])
-            
-            # Add segment from current position to this event
-            if event_hour > current_hour + 0.001:  # Small tolerance
-                segments.append({
-                    'status': current_status,
-                    'start_hour': round(current_hour, 2),
-                    'end_hour': round(event_hour, 2),
-                    'location': current_location,
-                    'notes': ''
-                })
-            
-            # Update current status
-            current_hour = event_hour
-            current_status = event['status']
-            current_location = event.get('location', '')
-        
-        # Fill to end of day
-        if current_hour < 24.0:
-            segments.append({
-                'status': current_status,
-                'start_hour': round(current_hour, 2),
-                'end_hour': 24.0,
-                'location': current_location,
-                'notes': ''
-            })
-        
-        # Merge consecutive segments with same status
-        segments = self._merge_segments(segments)
-        
-        # Validate total = 24
-        segments = self._normalize_segments(segments)
-        
-        return segments
-    
-    def _get_status_at_time(self, target_time: datetime, events: List[Dict], day_num: int) -> Dict:
+            minute = (event['ts'] - day_start_ts) // 60
+            grid[minute:] = event['status_code']
+            locations.append(event.get('location', ''))
+            loc_idx[minute:] = len(locations) - 1
+
+        # Run-length encode the grid: each run is one merged segment.
+        # tolist() yields native ints so the hour fields stay plain
+        # Python floats — orjson rejects numpy scalars at serialization
+        bounds = np.concatenate((
+            [0], np.flatnonzero(np.diff(grid)) + 1, [_MINUTES_PER_DAY]
+        )).tolist()
+
+        segments = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            # Use the location in effect at the start of the run, falling
+            # back to the first named location within it
+            location = locations[loc_idx[start]]
+            if not location:
+                for j in np.unique(loc_idx[start:end]):
+                    if locations[j]:
+                        location = locations[j]
+                        break
+            segments.append(Segment(
+                status=_STATUS_NAME[grid[start]],
+                start_hour=round(start / 60.0, 2),
+                end_hour=round(end / 60.0, 2),
+                location=location,
+                notes=''
+            ))
+
+        return segments, grid
+
+    def _get_status_at_time(self, target_ts: int, day_num: int) -> Dict:
         """Determine what duty status we're in at a specific time."""
         # Default to off_duty for the first day
         if day_num == 1:
-            return {'status': 'off_duty', 'location': ''}
-        
-        # Find the last event before target_time
-        last_event = None
-        for event in events:
-            event_time = datetime.fromisoformat(event['time'])
-            if event_time < target_time:
-                last_event = event
-            else:
-                break
-        
-        if last_event:
+            return {'status_code': _STATUS_CODE['off_duty'], 'location': ''}
+
+        # Locate the last event before target_ts in the sorted timeline
+        idx = bisect_left(self.event_ts, target_ts) - 1
+        if idx >= 0:
+            last_event = self.events[idx]
             return {
-                'status': last_event['status'],
+                'status_code': last_event['status_code'],
                 'location': last_event.get('location', '')
             }
-        
-        return {'status': 'off_duty', 'location': ''}
-    
-    def _time_to_hours(self, dt: datetime) -> float:
-        """Convert datetime to hours since midnight of that day."""
-        return dt.hour + dt.minute / 60.0 + dt.second / 3600.0
-    
-    def _merge_segments(self, segments: List[Dict]) -> List[Dict]:
-        """Merge consecutive segments with the same status."""
-        if not segments:
-            return []
-        
-        merged = [segments[0].copy()]
-        
-        for segment in segments[1:]:
-            if segment['status'] == merged[-1]['status']:
-                # Merge by extending end_hour
-                merged[-1]['end_hour'] = segment['end_hour']
-                # Keep location if we don't have one
-                if segment['location'] and not merged[-1]['location']:
-                    merged[-1]['location'] = segment['location']
-            else:
-                merged.append(segment.copy())
-        
-        return merged
-    
-    def _normalize_segments(self, segments: List[Dict]) -> List[Dict]:
-        """Ensure segments cover exactly 24 hours with no gaps or overlaps."""
-        if not segments:
-            return [{'status': 'off_duty', 'start_hour': 0.0, 'end_hour': 24.0, 'location': '', 'notes': ''}]
-        
-        normalized = []
-        
-        for i, segment in enumerate(segments):
-            start = segment['start_hour']
-            end = segment['end_hour']
-            
-            # Fix any gaps from previous segment
-            if normalized:
-                prev_end = normalized[-1]['end_hour']
-                if start > prev_end + 0.001:
-                    # There's a gap - extend previous segment
-                    normalized[-1]['end_hour'] = start
-            
-            # Add this segment
-            normalized.append({
-                'status': segment['status'],
-                'start_hour': round(start, 1),
-                'end_hour': round(end, 1),
-                'location': segment.get('location', ''),
-                'notes': segment.get('notes', '')
-            })
-        
-        # Ensure first segment starts at 0
-        if normalized and normalized[0]['start_hour'] > 0:
-            normalized[0]['start_hour'] = 0.0
-        
-        # Ensure last segment ends at 24
-        if normalized and normalized[-1]['end_hour'] < 24.0:
-            normalized[-1]['end_hour'] = 24.0
-        
-        return normalized
-    
-    def _calculate_totals(self, segments: List[Dict]) -> Dict:
-        """Calculate total hours for each duty status."""
+
+        return {'status_code': _STATUS_CODE['off_duty'], 'location': ''}
+
+    @staticmethod
+    def _calculate_totals(grid: np.ndarray) -> Dict:
+        """Calculate total hours for each duty status from the minute grid."""
+        minutes = np.bincount(grid, minlength=len(_STATUS_NAME))
         totals = {
-            'off_duty': 0.0,
-            'sleeper': 0.0,
-            'driving': 0.0,
-            'on_duty': 0.0
+            name: round(float(minutes[code]) / 60.0, 1)
+            for code, name in enumerate(_STATUS_NAME)
         }
-        
-        for segment in segments:
-            status = segment['status']
-            hours = segment['end_hour'] - segment['start_hour']
-            if status in totals and hours > 0:
-                totals[status] += hours
-        
-        # Round to 1 decimal place
-        for key in totals:
-            totals[key] = round(totals[key], 1)
-        
-        # Verify total is 24 (with small tolerance for rounding)
-        total = sum(totals.values())
-        if abs(total - 24.0) > 0.5:
-            # Adjust the largest value to make it 24
-            diff = 24.0 - total
+
+        # The grid always sums to 24h; nudge the largest bucket if the
+        # per-status rounding drifted
+        diff = 24.0 - sum(totals.values())
+        if abs(diff) > 0.05:
             max_key = max(totals, key=totals.get)
             totals[max_key] = round(totals[max_key] + diff, 1)
-        
+
         return totals
-    
-    def _calculate_day_miles(self, date, stops: List[Dict]) -> float:
+
+    def _calculate_day_miles(self, day_start_ts: int, day_stops: List[tuple]) -> float:
         """Calculate miles driven on a specific day."""
-        day_start = datetime.combine(date, datetime.min.time())
-        day_end = day_start + timedelta(days=1)
-        
-        day_stops = []
-        for stop in stops:
-            arrival = datetime.fromisoformat(stop['arrival_time'])
-            if day_start <= arrival < day_end:
-                day_stops.append(stop)
-        
         if not day_stops:
             return 0.0
-        
-        # Get miles range for this day
-        first_miles = day_stops[0]['cumulative_miles']
-        last_miles = day_stops[-1]['cumulative_miles']
-        
+
+        last_miles = day_stops[-1][0]['cumulative_miles']
+
         # For day 1, start from 0
-        if date == datetime.fromisoformat(stops[0]['arrival_time']).date():
+        if self.miles_timeline[0][0] >= day_start_ts:
             return last_miles
-        
-        # Find the last stop from previous day
-        prev_day_miles = 0.0
-        for stop in stops:
-            arrival = datetime.fromisoformat(stop['arrival_time'])
-            if arrival < day_start:
-                prev_day_miles = stop['cumulative_miles']
-            else:
-                break
-        
+
+        # Odometer reading at the last stop before this day's midnight
+        idx = bisect_left(self.miles_timeline, (day_start_ts,)) - 1
+        prev_day_miles = self.miles_timeline[idx][1] if idx >= 0 else 0.0
+
         return last_miles - prev_day_miles
-    
-    def _generate_remarks(self, date, stops: List[Dict]) -> List[Dict]:
+
+    @staticmethod
+    def _generate_remarks(day_stops: List[tuple]) -> List[Dict]:
         """Generate remarks section with location changes for a specific day."""
         remarks = []
-        day_start = datetime.combine(date, datetime.min.time())
-        day_end = day_start + timedelta(days=1)
-        
-        for stop in stops:
-            arrival = datetime.fromisoformat(stop['arrival_time'])
-            if day_start <= arrival < day_end:
-                remarks.append({
-                    'time': arrival.strftime('%H:%M'),
-                    'location': stop['location'],
-                    'activity': stop.get('notes', stop['type'])
-                })
-        
+        for stop, arrival in day_stops:
+            remarks.append({
+                'time': arrival.strftime('%H:%M'),
+                'location': stop['location'],
+                'activity': stop.get('notes', stop['type'])
+            })
+
         return remarks
+
+
+class LogGenerator:
+    """
+    Generates ELD daily log sheets from trip stops.
+
+    Each log sheet covers a 24-hour period (midnight to midnight).
+    The duty status line is continuous through the entire period.
+    """
+
+    def __init__(self):
+        self.log_sheets: List[Dict] = []
+
+    def generate_logs(self, stops: List[Dict]) -> List[Dict]:
+        """
+        Generate daily log sheets from trip stops.
+
+        Args:
+            stops: List of planned stops with timing information
+
+        Returns:
+            List of daily log sheets
+        """
+        if not stops:
+            return []
+
+        # All parsing, sorting and bucketing happens once here; each
+        # day's sheet is then a cheap query against the timeline
+        timeline = Timeline(stops)
+
+        self.log_sheets = [
+            timeline.day_log(date, day_num)
+            for day_num, date in enumerate(timeline.date_range(), start=1)
+        ]
+
+        return self.log_sheets
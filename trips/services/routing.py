@@ -2,18 +2,63 @@
 Routing service using OSRM (Open Source Routing Machine).
 Gets routes, distances, and route geometry.
 """
+import logging
+
 import requests
+from math import radians, sin, cos, sqrt, atan2
 from typing import List, Dict, Optional, Tuple
+
+import numpy as np
 import polyline
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+_EARTH_RADIUS_MILES = 3959
+
+# One shared keep-alive session to the OSRM endpoint: reusing the pooled
+# TLS connection saves a full handshake per routing call, and transient
+# gateway errors are retried with backoff
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=50,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+))
+
+
+def _haversine(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Distance in miles between two points, scalar fast path."""
+    lat1, lng1, lat2, lng2 = radians(lat1), radians(lng1), radians(lat2), radians(lng2)
+
+    dlat = lat2 - lat1
+    dlng = lng2 - lng1
+
+    a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlng / 2) ** 2
+    c = 2 * atan2(sqrt(a), sqrt(1 - a))
+
+    return _EARTH_RADIUS_MILES * c
 
 
 class RoutingService:
     """Service for getting routes using OSRM."""
     
     BASE_URL = "https://router.project-osrm.org/route/v1/driving"
-    
+    # (connect, read) timeouts so a stalled OSRM call can't hang a worker
+    REQUEST_TIMEOUT = (3, 10)
+    ROUTE_CACHE_SIZE = 128
+
     def __init__(self):
-        self.session = requests.Session()
+        self.session = _SESSION
+        # Routes keyed on rounded waypoint coordinates: repeat trips
+        # between the same city pair skip the OSRM round trip entirely
+        self._route_cache: Dict[Tuple, Dict] = {}
+        # Single-entry memo of the distance profile for the most recently
+        # queried geometry: stop planning asks for many points along the
+        # same route in a row. The keyed object itself is kept in the memo
+        # so its identity can't be recycled for a different geometry.
+        self._profile = None
     
     def get_route(self, waypoints: List[Dict]) -> Optional[Dict]:
         """
@@ -27,10 +72,16 @@ class RoutingService:
         """
         if len(waypoints) < 2:
             return None
-        
+
+        # ~4 decimal places = ~11m, well within geocoding precision
+        cache_key = tuple((round(w['lat'], 4), round(w['lng'], 4)) for w in waypoints)
+        cached = self._route_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         # Build coordinates string: lng,lat;lng,lat;...
         coords = ';'.join([f"{w['lng']},{w['lat']}" for w in waypoints])
-        
+
         try:
             response = self.session.get(
                 f"{self.BASE_URL}/{coords}",
@@ -38,19 +89,24 @@ class RoutingService:
                     'overview': 'full',
                     'geometries': 'polyline',
                     'steps': 'true'
-                }
+                },
+                timeout=self.REQUEST_TIMEOUT
             )
             response.raise_for_status()
             data = response.json()
             
             if data.get('code') != 'Ok':
-                print(f"OSRM error: {data.get('message', 'Unknown error')}")
+                logger.warning("OSRM error: %s", data.get('message', 'Unknown error'))
                 return None
             
             route = data['routes'][0]
             
-            # Decode the polyline geometry to lat/lng pairs
-            geometry = polyline.decode(route['geometry'])
+            # Decode the polyline geometry straight into a float64 array:
+            # one Nx2 block instead of thousands of boxed tuple pairs, and
+            # it feeds the vectorized distance math without conversion.
+            # polyline5 quantizes to 1e-5 degrees (~1m), so the decoded
+            # values are already at map-display precision
+            geometry = np.asarray(polyline.decode(route['geometry']), dtype=np.float64)
             
             # Get leg distances
             legs = []
@@ -60,77 +116,116 @@ class RoutingService:
                     'duration_hours': leg['duration'] / 3600      # seconds to hours
                 })
             
-            return {
+            result = {
                 'total_distance_miles': route['distance'] / 1609.34,
                 'total_duration_hours': route['duration'] / 3600,
-                'geometry': geometry,  # List of [lat, lng] pairs
+                'geometry': geometry,  # Nx2 float64 array of (lat, lng)
                 'legs': legs
             }
+
+            if len(self._route_cache) >= self.ROUTE_CACHE_SIZE:
+                # Drop the oldest entry (insertion order)
+                self._route_cache.pop(next(iter(self._route_cache)))
+            self._route_cache[cache_key] = result
+            return result
         except Exception as e:
-            print(f"Routing error: {e}")
+            logger.warning("Routing error: %s", e)
             return None
     
+    @staticmethod
+    def cum_distance_miles(geometry) -> np.ndarray:
+        """
+        Cumulative distance in miles at each point of a route geometry.
+
+        Computes all per-segment haversine distances in one vectorized
+        NumPy pass instead of looping over the polyline in Python.
+
+        Args:
+            geometry: Sequence of (lat, lng) pairs (or an Nx2 array)
+
+        Returns:
+            Array of length N where entry i is the distance from the start
+            to geometry point i
+        """
+        geom = np.asarray(geometry, dtype=np.float64)
+        lat = np.radians(geom[:, 0])
+        lng = np.radians(geom[:, 1])
+        dlat = np.diff(lat)
+        dlng = np.diff(lng)
+
+        a = np.sin(dlat / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(dlng / 2) ** 2
+        segment_miles = 2 * _EARTH_RADIUS_MILES * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+        return np.concatenate(([0.0], np.cumsum(segment_miles)))
+
+    def _distance_profile(self, geometry) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (points array, cumulative miles) for a geometry, memoized."""
+        if self._profile is None or self._profile[0] is not geometry:
+            geom = np.asarray(geometry, dtype=np.float64)
+            self._profile = (geometry, geom, self.cum_distance_miles(geom))
+        return self._profile[1], self._profile[2]
+
     def get_point_along_route(
-        self, 
-        geometry: List[Tuple[float, float]], 
+        self,
+        geometry: List[Tuple[float, float]],
         target_distance_miles: float
     ) -> Optional[Tuple[float, float]]:
         """
         Find a point along the route at a specific distance.
-        
+
         Args:
             geometry: List of (lat, lng) tuples
             target_distance_miles: Distance in miles from the start
-            
+
         Returns:
             (lat, lng) tuple or None
         """
-        if not geometry or target_distance_miles <= 0:
-            return geometry[0] if geometry else None
-        
-        cumulative_distance = 0.0
-        
-        for i in range(len(geometry) - 1):
-            segment_distance = self._haversine_distance(
-                geometry[i][0], geometry[i][1],
-                geometry[i + 1][0], geometry[i + 1][1]
-            )
-            
-            if cumulative_distance + segment_distance >= target_distance_miles:
-                # Interpolate within this segment
-                remaining = target_distance_miles - cumulative_distance
-                ratio = remaining / segment_distance if segment_distance > 0 else 0
-                
-                lat = geometry[i][0] + ratio * (geometry[i + 1][0] - geometry[i][0])
-                lng = geometry[i][1] + ratio * (geometry[i + 1][1] - geometry[i][1])
-                
-                return (lat, lng)
-            
-            cumulative_distance += segment_distance
-        
-        # Return last point if distance exceeds route length
-        return geometry[-1]
+        # len() rather than truthiness so ndarray geometries work too
+        if geometry is None or len(geometry) == 0:
+            return None
+
+        geom, cum = self._distance_profile(geometry)
+
+        if target_distance_miles <= 0:
+            return (float(geom[0, 0]), float(geom[0, 1]))
+
+        # Past the end of the route: return the last point
+        if target_distance_miles >= cum[-1]:
+            return (float(geom[-1, 0]), float(geom[-1, 1]))
+
+        # np.interp does the bracket search and interpolation in one C call
+        lat = float(np.interp(target_distance_miles, cum, geom[:, 0]))
+        lng = float(np.interp(target_distance_miles, cum, geom[:, 1]))
+        return (lat, lng)
+
+    def get_points_along_route(
+        self,
+        geometry: List[Tuple[float, float]],
+        target_distances_miles
+    ) -> np.ndarray:
+        """
+        Batched variant of get_point_along_route.
+
+        Args:
+            geometry: List of (lat, lng) tuples or an Nx2 array
+            target_distances_miles: Array of distances in miles from the start
+
+        Returns:
+            Mx2 array of (lat, lng) pairs, clamped to the route's endpoints
+        """
+        geom, cum = self._distance_profile(geometry)
+        targets = np.asarray(target_distances_miles, dtype=np.float64)
+        lats = np.interp(targets, cum, geom[:, 0])
+        lngs = np.interp(targets, cum, geom[:, 1])
+        return np.column_stack((lats, lngs))
     
     def _haversine_distance(
-        self, 
-        lat1: float, 
-        lng1: float, 
-        lat2: float, 
+        self,
+        lat1: float,
+        lng1: float,
+        lat2: float,
         lng2: float
     ) -> float:
         """
         Calculate the distance between two points in miles.
         """
-        from math import radians, sin, cos, sqrt, atan2
-        
-        R = 3959  # Earth's radius in miles
-        
-        lat1, lng1, lat2, lng2 = map(radians, [lat1, lng1, lat2, lng2])
-        
-        dlat = lat2 - lat1
-        dlng = lng2 - lng1
-        
-        a = sin(dlat / 2)**2 + cos(lat1) * cos(lat2) * sin(dlng / 2)**2
-        c = 2 * atan2(sqrt(a), sqrt(1 - a))
-        
-        return R * c
+        return _haversine(lat1, lng1, lat2, lng2)
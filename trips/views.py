@@ -1,13 +1,36 @@
 """
 Views for ELD Trip Planner API.
 """
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+import orjson
+from django.core.cache import cache
+from django.http import HttpResponse
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from django.utils import timezone
 
+from .models import Trip
 from .serializers import TripInputSerializer
 from .services import GeocodingService, RoutingService, HOSCalculator, LogGenerator
 
+logger = logging.getLogger(__name__)
+
+# The geocoder and router hold no per-request state (caches and pooled
+# HTTP sessions only), so one instance serves all requests and keeps
+# connections and caches warm across calls
+geocoder = GeocodingService()
+router = RoutingService()
+
+# Long-lived pool for the geocode fan-out: reusing warm threads across
+# requests avoids spawning and joining three threads per call
+_geocode_pool = ThreadPoolExecutor(max_workers=6, thread_name_prefix='geocode')
+
 
 @api_view(['POST'])
 def plan_trip(request):
@@ -35,27 +58,57 @@ def plan_trip(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     data = serializer.validated_data
-    
-    # Initialize services
-    geocoder = GeocodingService()
-    router = RoutingService()
-    
+
+    # In-process fast path: content-hash of the validated input (including
+    # current_cycle_hours, which affects HOS output) looked up in the local
+    # cache before touching the database or any network service
+    cache_key = 'trip:' + hashlib.blake2b(
+        orjson.dumps(data, option=orjson.OPT_SORT_KEYS), digest_size=16
+    ).hexdigest()
+    cached_response = cache.get(cache_key)
+    if cached_response is not None:
+        return HttpResponse(
+            orjson.dumps(cached_response),
+            content_type='application/json',
+            status=status.HTTP_200_OK
+        )
+
+    # Repeat-trip fast path: an identical request planned today is served
+    # from the memoized response with a single indexed SELECT, skipping
+    # geocoding, routing and HOS planning entirely. Results from previous
+    # days are ignored because trips are scheduled from 6 AM today.
+    cached_trip = Trip.objects.filter(
+        current_location=data['current_location'],
+        pickup_location=data['pickup_location'],
+        dropoff_location=data['dropoff_location'],
+        current_cycle_hours=data['current_cycle_hours'],
+        results_json__isnull=False,
+        updated_at__date=timezone.localdate()
+    ).order_by('-updated_at').first()
+    if cached_trip is not None:
+        return HttpResponse(
+            orjson.dumps(cached_trip.results_json),
+            content_type='application/json',
+            status=status.HTTP_200_OK
+        )
+
     try:
-        # 1. Geocode all locations
-        locations = {}
-        for key, field in [
-            ('current', 'current_location'),
-            ('pickup', 'pickup_location'),
-            ('dropoff', 'dropoff_location')
-        ]:
-            result = geocoder.geocode(data[field])
-            if not result:
+        # 1. Geocode all locations concurrently: three independent lookups,
+        # so wall time is the slowest one instead of the sum of all three
+        fields = {
+            'current': data['current_location'],
+            'pickup': data['pickup_location'],
+            'dropoff': data['dropoff_location']
+        }
+        locations = dict(zip(fields, _geocode_pool.map(geocoder.geocode, fields.values())))
+
+        for key, address in fields.items():
+            if not locations[key]:
                 return Response(
-                    {'error': f'Could not find location: {data[field]}'},
+                    {'error': f'Could not find location: {address}'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            locations[key] = result
-        
+
         # 2. Get route through all waypoints
         waypoints = [
             {'lat': locations['current']['lat'], 'lng': locations['current']['lng']},
@@ -79,26 +132,56 @@ def plan_trip(request):
             geocoder=geocoder
         )
         
+        # Stops are slotted dataclasses; convert to dicts once at the
+        # serialization boundary
+        stops_data = [asdict(stop) for stop in stops]
+
         # 4. Generate ELD log sheets
         log_gen = LogGenerator()
-        log_sheets = log_gen.generate_logs(stops)
-        
+        log_sheets = log_gen.generate_logs(stops_data)
+
         # 5. Get trip summary
         summary = hos.get_summary(route['total_distance_miles'])
-        
-        # Prepare response
+
+        # Prepare response; geometry stays an ndarray through the pipeline
+        # and becomes a plain list only here at the JSON boundary
         response_data = {
-            'route_geometry': route['geometry'],
-            'stops': stops,
+            'route_geometry': route['geometry'].tolist(),
+            'stops': stops_data,
             'log_sheets': log_sheets,
             'summary': summary
         }
-        
-        return Response(response_data, status=status.HTTP_200_OK)
+
+        # The output shape is fixed, so skip DRF's renderer and serialize
+        # directly with orjson (C-level serialization of the large geometry
+        # and stop lists). Serialize before memoizing so a payload that
+        # fails here can never be cached and replayed by the fast paths.
+        payload = orjson.dumps(response_data)
+
+        # Memoize the full response for repeat requests. The TTL never
+        # crosses midnight: plans are scheduled from 6 AM today, so a
+        # cached response goes stale when the date changes.
+        seconds_to_midnight = int(
+            (datetime.combine(timezone.localdate() + timedelta(days=1), datetime.min.time())
+             - datetime.now()).total_seconds()
+        )
+        cache.set(cache_key, response_data, timeout=max(1, min(3600, seconds_to_midnight)))
+        Trip.objects.update_or_create(
+            current_location=data['current_location'],
+            pickup_location=data['pickup_location'],
+            dropoff_location=data['dropoff_location'],
+            current_cycle_hours=data['current_cycle_hours'],
+            defaults={'results_json': response_data}
+        )
+
+        return HttpResponse(
+            payload,
+            content_type='application/json',
+            status=status.HTTP_200_OK
+        )
         
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("plan_trip failed")
         return Response(
             {'error': f'An error occurred while planning the trip: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR